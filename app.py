@@ -16,12 +16,19 @@ License: MIT
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import csv
+import io
 import logging
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 
 # Setup logging to track API calls and application flow
 logging.basicConfig(level=logging.INFO)
@@ -30,12 +37,125 @@ logger = logging.getLogger(__name__)
 # Initialize Jikan API v4 base URL
 JIKAN_API_URL = "https://api.jikan.moe/v4"
 
+# Endpoint URLs and base search parameters, built once instead of per rerun
+ANIME_URL = f"{JIKAN_API_URL}/anime"
+TOP_ANIME_URL = f"{JIKAN_API_URL}/top/anime"
+SEARCH_BASE_PARAMS = {'sfw': 'true'}  # Filter out adult content
+
+# Map user-friendly anime type labels to Jikan API values
+TYPE_DISPLAY_TO_API = {
+    "TV": "tv",
+    "Movie": "movie",
+    "OVA": "ova",
+    "Special": "special",
+    "ONA": "ona",
+    "Music": "music"
+}
+
+# Number of results rendered per page in the Search results table
+RESULTS_PAGE_SIZE = 10
+
+# Minimum query length before the Compare view asks the API for suggestions
+MIN_SUGGESTION_QUERY_LENGTH = 3
+
+# Rows of the comparison CSV export as (label, Jikan field)
+COMPARISON_FIELDS = [
+    ('Score', 'score'),
+    ('Episodes', 'episodes'),
+    ('Members', 'members'),
+    ('Type', 'type'),
+    ('Status', 'status')
+]
+
+# Average episode length in minutes, used for the time investment estimate
+AVG_EPISODE_LENGTH = 23
+
+# Name of the shared Plotly template registered by register_plot_template
+PLOT_TEMPLATE = "anime"
+
+# Jikan API rate limits as (max requests, window in seconds)
+RATE_LIMITS = [(3, 1.0), (60, 60.0)]
+
+# Maximum number of API requests in flight at once (matches the 3 req/s limit)
+MAX_CONCURRENT_REQUESTS = 3
+
+@st.cache_resource
+def _rate_limit_windows():
+    """
+    Recent request timestamps, one deque per rate limit window.
+    
+    Held in st.cache_resource because the script body re-executes on every
+    rerun, which would otherwise reset plain module globals.
+    
+    Returns:
+        tuple: A lock guarding the windows and a list with a deque of
+            monotonic timestamps for each entry in RATE_LIMITS
+    """
+    return threading.Lock(), [deque(maxlen=max_calls) for max_calls, _ in RATE_LIMITS]
+
+@st.cache_resource
+def jikan_session():
+    """
+    Shared HTTP session for all Jikan API calls.
+    
+    Repeated calls reuse pooled keep-alive connections instead of paying a new
+    TCP/TLS handshake each time. Held in st.cache_resource so the pool survives
+    reruns and is shared across user sessions. Rate-limit (429) and server
+    errors are retried with exponential backoff.
+    
+    Returns:
+        requests.Session: The configured session
+    """
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"]
+        )
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+def wait_for_rate_limit():
+    """
+    Sleep only as long as needed to stay within the Jikan rate limits.
+    
+    A request is delayed only when the last N requests of a window all happened
+    within that window, so an isolated request goes out immediately. Genuine
+    429 responses are still handled by the session's Retry backoff.
+    """
+    lock, windows = _rate_limit_windows()
+    # Reserve a send slot under the lock, then sleep outside it so concurrent
+    # callers queue up behind each other instead of serializing on the lock
+    with lock:
+        now = time.monotonic()
+        send_at = now
+        for (max_calls, period), calls in zip(RATE_LIMITS, windows):
+            if len(calls) == max_calls:
+                send_at = max(send_at, calls[0] + period)
+        for calls in windows:
+            calls.append(send_at)
+    
+    wait = send_at - now
+    if wait > 0:
+        logger.info(f"Rate limit reached, waiting {wait:.2f}s")
+        time.sleep(wait)
+
 def rate_limited_request(url, params=None):
     """
     Make a rate-limited request to the Jikan API with proper error handling.
     
     The Jikan API has rate limits of 3 requests per second and 60 per minute.
-    This function implements a 1-second delay between requests to respect these limits.
+    Requests are throttled by wait_for_rate_limit to respect them, and HTTP
+    429/5xx responses are retried with backoff by the session. A search
+    rejected with an error payload is retried once with only the title query.
+    
+    Responses are not cached here; the callers cache the results they derive
+    from them, so each payload is stored once and in its final form.
     
     Args:
         url (str): The API endpoint URL
@@ -47,33 +167,353 @@ def rate_limited_request(url, params=None):
     Raises:
         Exception: If the API request fails
     """
+    params = params or {}
+    attempts = [params]
+    # Retry with simpler parameters if this was a search
+    if 'q' in params and len(params) > 1:
+        attempts.append({'q': params['q']})
+    
     try:
-        logger.info(f"Making API request to: {url} with params: {params}")
-        time.sleep(1)  # Rate limit: max 3 requests per second
-        response = requests.get(url, params=params)
-        logger.info(f"API response status: {response.status_code}")
-        
-        json_data = response.json()
-        logger.info(f"API returned data with keys: {json_data.keys()}")
-        
-        # Jikan API may return 200 status with error details instead of data
-        if 'error' in json_data and not json_data.get('data'):
-            error_msg = json_data.get('messages', {}).get('error', str(json_data.get('error')))
-            logger.error(f"API returned error: {error_msg}")
-            # Retry with simpler parameters if this was a search
-            if 'q' in params and len(params) > 1:
+        for attempt, attempt_params in enumerate(attempts):
+            if attempt:
                 logger.info("Retrying with simplified parameters")
-                return rate_limited_request(url, {'q': params['q']})
-            return json_data
+            logger.info(f"Making API request to: {url} with params: {attempt_params}")
+            wait_for_rate_limit()
+            response = jikan_session().get(url, params=attempt_params, timeout=30)
+            logger.info(f"API response status: {response.status_code}")
+            
+            json_data = response.json()
+            logger.info(f"API returned data with keys: {json_data.keys()}")
             
-        if 'data' in json_data:
-            logger.info(f"API returned {len(json_data['data'])} results")
+            # Jikan API may return 200 status with error details instead of data
+            if 'error' in json_data and not json_data.get('data'):
+                error_msg = json_data.get('messages', {}).get('error', str(json_data.get('error')))
+                logger.error(f"API returned error: {error_msg}")
+                continue
+                
+            if 'data' in json_data:
+                logger.info(f"API returned {len(json_data['data'])} results")
+            
+            return json_data
         
         return json_data
     except requests.exceptions.RequestException as e:
         logger.error(f"API request failed: {str(e)}")
         raise Exception(f"Failed to fetch data: {str(e)}")
 
+@st.cache_resource
+def request_executor():
+    """
+    Thread pool shared by background API calls such as the Top Anime prefetch.
+    
+    One pool per process, so prefetches from all sessions share a few workers
+    instead of each spinning up their own threads. Tasks run without a script
+    run context; the rate limiter is process-wide, so they still draw on the
+    same budget as every other request.
+    
+    Returns:
+        ThreadPoolExecutor: The shared executor
+    """
+    return ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="jikan")
+
+def fetch_many(fetch, args_list):
+    """
+    Run several API fetches concurrently.
+    
+    Each fetch goes through the shared rate limiter and the pooled session, so
+    only the network waits overlap. The caller blocks on the results, so the
+    worker threads take on its script run context and Streamlit calls made from
+    them behave as if they ran on the script thread. The workers only live for
+    this call, so the context never outlasts it.
+    
+    Duplicate arguments are fetched once and share the result, e.g. when both
+    comparison slots hold the same anime. Identical calls already in flight
+    elsewhere are coalesced by st.cache_data, which lets only one thread
+    compute a given cache entry while the others wait for it.
+    
+    Args:
+        fetch (callable): The fetch function to call with each argument
+        args_list (list): One argument per fetch
+        
+    Returns:
+        list: The fetch results, in the same order as args_list
+    """
+    # dict.fromkeys keeps the first occurrence order while dropping duplicates
+    unique_args = list(dict.fromkeys(args_list))
+    with ThreadPoolExecutor(
+        max_workers=min(len(unique_args), MAX_CONCURRENT_REQUESTS) or 1,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx())
+    ) as executor:
+        results = dict(zip(unique_args, executor.map(fetch, unique_args)))
+    return [results[arg] for arg in args_list]
+
+@st.cache_data(ttl=60 * 60 * 24, show_spinner=False)  # Cache lookups for a day
+def fetch_anime_by_id(mal_id):
+    """
+    Fetch the full details of one anime by its MyAnimeList ID.
+    
+    Looking up by ID is exact, unlike a title search, and keeps one cache
+    entry per anime. The response is reduced to the render-ready fields the
+    comparison uses, so cache hits need no further lookups or slicing.
+    
+    Args:
+        mal_id (str): The MyAnimeList ID of the anime
+        
+    Returns:
+        dict: The anime's comparison fields, or None if it wasn't found
+    """
+    anime = rate_limited_request(f"{ANIME_URL}/{mal_id}/full").get('data')
+    if not anime:
+        return None
+    
+    return {
+        'title': anime['title'],
+        'image': anime.get('images', {}).get('jpg', {}).get('image_url', ''),
+        'synopsis_short': (anime.get('synopsis') or 'No synopsis available.')[:200],
+        'score': anime.get('score'),
+        'members': anime.get('members'),
+        'episodes': anime.get('episodes'),
+        'type': anime.get('type') or 'Unknown',
+        'status': anime.get('status') or 'Unknown',
+        'aired': (anime.get('aired') or {}).get('string') or 'Unknown',
+        'genres': [g['name'] for g in anime.get('genres', [])],
+        'studios': [s['name'] for s in anime.get('studios', [])]
+    }
+
+@st.cache_data(ttl=60 * 10, max_entries=50, show_spinner=False)
+def to_csv_bytes(df):
+    """
+    Serialize a DataFrame to UTF-8 encoded CSV for a download button.
+    
+    Cached on the DataFrame contents, so reruns with unchanged data reuse the
+    bytes instead of re-serializing the whole table.
+    
+    Args:
+        df (pd.DataFrame): The data to export
+        
+    Returns:
+        bytes: The CSV file contents
+    """
+    return df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(ttl=60 * 60 * 24, max_entries=200, show_spinner=False)
+def comparison_csv(mal_id1, mal_id2, payload):
+    """
+    Build the comparison CSV export for two anime.
+    
+    Cached on the two MAL IDs and the exported values, so reruns of an
+    unchanged comparison reuse the bytes.
+    
+    Args:
+        mal_id1 (str): The MyAnimeList ID of the first anime
+        mal_id2 (str): The MyAnimeList ID of the second anime
+        payload (tuple): (title, values) for each anime, with values ordered
+            as COMPARISON_FIELDS
+        
+    Returns:
+        bytes: The CSV file contents
+    """
+    (title1, values1), (title2, values2) = payload
+    # Ten cells don't need a DataFrame; write them with the csv module directly
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(['Metric', title1, title2])
+    for (label, _), value1, value2 in zip(COMPARISON_FIELDS, values1, values2):
+        writer.writerow([label, value1, value2])
+    return buf.getvalue().encode('utf-8')
+
+@st.cache_data(ttl=60 * 60 * 24, max_entries=200, show_spinner=False)
+def comparison_insights(a1, a2):
+    """
+    Compute the Quick Insights shown below a comparison.
+    
+    Cached on the anime details themselves, which are small projections, so a
+    refreshed score or episode count yields fresh insights right away.
+    
+    Args:
+        a1 (dict): The fetch_anime_by_id details of the first anime
+        a2 (dict): The fetch_anime_by_id details of the second anime
+        
+    Returns:
+        dict: 'winner' as (title, higher score, lower score) or None on a tie,
+            'common_genres' as a list of names, and 'watch_minutes' as a pair
+            of total runtimes or None when an episode count is unknown
+    """
+    # Score comparison
+    score1, score2 = a1['score'] or 0, a2['score'] or 0
+    winner = None
+    if score1 > score2:
+        winner = (a1['title'], score1, score2)
+    elif score2 > score1:
+        winner = (a2['title'], score2, score1)
+    
+    # Genre analysis; genre lists are short, so a list scan beats building sets
+    common_genres = [genre for genre in a1['genres'] if genre in a2['genres']]
+    
+    # Time investment analysis
+    watch_minutes = None
+    if isinstance(a1['episodes'], int) and isinstance(a2['episodes'], int):
+        watch_minutes = (
+            a1['episodes'] * AVG_EPISODE_LENGTH,
+            a2['episodes'] * AVG_EPISODE_LENGTH
+        )
+    
+    return {
+        'winner': winner,
+        'common_genres': common_genres,
+        'watch_minutes': watch_minutes
+    }
+
+def register_plot_template():
+    """
+    Register the dashboard's Plotly template and make it the default.
+    
+    Shared layout defaults live in one template instead of being re-applied
+    with update_layout on every figure. Safe to call repeatedly.
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    
+    if PLOT_TEMPLATE not in pio.templates:
+        pio.templates[PLOT_TEMPLATE] = go.layout.Template(layout=dict(
+            font=dict(size=12),
+            title=dict(x=0),
+            hoverlabel=dict(font_size=12)
+        ))
+        pio.templates.default = f"plotly+{PLOT_TEMPLATE}"
+
+@st.cache_data(ttl=60 * 10, max_entries=100, show_spinner=False)
+def score_histogram(scores, title, xaxis_title, yaxis_title, height):
+    """
+    Build the score distribution histogram shared by the Search and Top views.
+    
+    Cached on the score values and chart options, so reruns that don't change
+    the plotted data reuse the figure instead of rebuilding Plotly traces.
+    
+    Args:
+        scores (np.ndarray): The anime scores to bin
+        title (str): The chart title
+        xaxis_title (str): The x-axis label
+        yaxis_title (str): The y-axis label
+        height (int): The chart height in pixels
+        
+    Returns:
+        go.Figure: The histogram figure
+    """
+    import plotly.express as px
+    register_plot_template()
+    
+    fig = px.histogram(
+        x=scores,
+        labels={'x': 'score'},  # Keep "score=" in the hover text
+        title=title,
+        nbins=20,
+        height=height,
+        color_discrete_sequence=['#FF4B4B']
+    )
+    fig.update_layout(xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
+
+def prefetch_top_anime():
+    """
+    Warm the fetch_top_df cache with the default Top Anime query.
+    
+    Runs on the request executor while the user is on another view, so switching
+    to "Top Anime" is served from cache. Errors are only logged since the view
+    fetches again (and reports failures) when it is opened.
+    
+    The task is submitted without the session's script run context: while a
+    cached function computes, Streamlit flags its context as being inside a
+    cached call, and sharing that context would make the widgets the script
+    thread renders meanwhile raise CachedWidgetWarning.
+    """
+    try:
+        # Same arguments as the view's default call, since st.cache_data keys on
+        # the arguments as passed and doesn't fill in defaults
+        fetch_top_df(None, None)
+    except Exception as e:
+        logger.warning(f"Top anime prefetch failed: {str(e)}")
+
+@st.cache_data(ttl=60 * 10, show_spinner=False)
+def fetch_search_df(query, anime_types):
+    """
+    Search for anime by title and build an unfiltered results DataFrame.
+    
+    Cached separately from the score filter, so moving the slider only re-runs
+    a cheap boolean mask instead of re-parsing the API response.
+    
+    Args:
+        query (str): The anime title to search for
+        anime_types (tuple): API type values to restrict the search to
+        
+    Returns:
+        pd.DataFrame: One row per result, empty if nothing was found
+    """
+    # Prepare API request parameters
+    params = {**SEARCH_BASE_PARAMS, 'q': query}
+    if anime_types:
+        params['type'] = ','.join(anime_types)
+    
+    # Debug output for parameters
+    logger.info(f"API parameters: {params}")
+    
+    results = rate_limited_request(ANIME_URL, params=params)
+    if not results.get('data'):
+        return pd.DataFrame()
+    
+    # Flatten the nested JSON in one vectorized pass, then keep the columns we use
+    df = pd.json_normalize(results['data']).rename(columns={
+        'images.jpg.image_url': 'image',
+        'synopsis': 'description'
+    })
+    df = df.reindex(columns=['title', 'image', 'description', 'score', 'type', 'episodes', 'members'])
+    return df.fillna({
+        'image': '',
+        'description': 'No description available',
+        'score': 0,
+        'type': 'Unknown',
+        'episodes': 0,
+        'members': 0
+    })
+
+@st.cache_data(ttl=60 * 10, show_spinner=False)
+def fetch_top_df(top_filter=None, anime_type=None):
+    """
+    Fetch the top anime rankings and build an unfiltered DataFrame.
+    
+    Args:
+        top_filter (str, optional): Jikan ranking filter, e.g. "airing"
+        anime_type (str, optional): API type value, e.g. "tv"
+        
+    Returns:
+        pd.DataFrame: One row per ranked anime, empty if nothing was returned
+    """
+    # Set up parameters based on API documentation
+    params = {}
+    if top_filter:
+        params['filter'] = top_filter
+    if anime_type:
+        params['type'] = anime_type
+    
+    results = rate_limited_request(TOP_ANIME_URL, params=params)
+    if not results.get('data'):
+        return pd.DataFrame()
+    
+    # Keep only the columns the rankings table, charts and export use
+    df = pd.json_normalize(results['data']).reindex(columns=[
+        'rank', 'title', 'score', 'type', 'episodes', 'status', 'members'
+    ])
+    # Jikan sends null episodes for airing titles; a nullable integer column keeps
+    # them blank while the table still renders and sorts the rest as numbers
+    return df.fillna({
+        'rank': 0,
+        'score': 0,
+        'type': 'Unknown',
+        'status': 'Unknown',
+        'members': 0
+    }).astype({'episodes': 'Int64'})
+
 # Configure the Streamlit page with responsive design options
 st.set_page_config(
     page_title="Anime Dashboard",
@@ -81,6 +521,11 @@ st.set_page_config(
     layout="wide"  # Use wide layout for better visualization display
 )
 
+# Prefetch the default Top Anime rankings once per session
+if not st.session_state.get('prefetched'):
+    st.session_state['prefetched'] = True
+    request_executor().submit(prefetch_top_anime)
+
 # Main title for the dashboard
 st.title("Anime Dashboard")
 
@@ -90,15 +535,20 @@ def is_mobile():
     
     This function checks if a mobile view parameter is set in the session state
     or in the query parameters. This allows for responsive design adjustments.
+    The result is stored in the session state, so later reruns skip the lookup.
     
     Returns:
         bool: True if the app is being viewed on a mobile device, False otherwise
     """
-    try:
-        return st.session_state.get('mobile_view', 
-            st.query_params().get('mobile', ['false'])[0] == 'true')
-    except:
-        return False
+    if '_is_mobile' in st.session_state:
+        return st.session_state['_is_mobile']
+    
+    mobile = bool(
+        st.session_state.get('mobile_view')
+        or st.query_params.get('mobile', 'false') == 'true'
+    )
+    st.session_state['_is_mobile'] = mobile
+    return mobile
 
 # Adjust chart height based on view type (mobile or desktop)
 chart_height = 300 if is_mobile() else 500
@@ -113,9 +563,20 @@ view_mode = st.sidebar.radio(
 # =====================================================================
 # SEARCH ANIME VIEW - Allows users to search for anime by title
 # =====================================================================
-if view_mode == "Search Anime":
+@st.fragment
+def search_view():
+    """
+    Render the Search Anime view.
+    
+    As a fragment, editing the query, moving the score slider or loading more
+    results reruns only the search, not the sidebar and page setup.
+    """
     logger.info(f"Accessing Search Anime view")
     
+    # Plotly is imported only by the views that chart, keeping cold start light
+    import plotly.express as px
+    register_plot_template()
+    
     # Add header and description
     st.header("🔍 Anime Discovery Engine", divider="rainbow")
     st.caption("Find hidden gems and popular titles matching your preferences")
@@ -139,16 +600,14 @@ if view_mode == "Search Anime":
     
     # Component 4: Multiselect for filtering by anime type
     # Display user-friendly labels while using correct API values
-    anime_types_display = ["TV", "Movie", "OVA", "Special", "ONA", "Music"]
-    anime_types_api = ["tv", "movie", "ova", "special", "ona", "music"]
     selected_types_display = st.multiselect(
         "Select Anime Types",
-        anime_types_display,
+        list(TYPE_DISPLAY_TO_API),
         ["TV"]
     )
     
     # Convert display values to API values for the request
-    selected_types_api = [anime_types_api[anime_types_display.index(t)] for t in selected_types_display]
+    selected_types_api = [TYPE_DISPLAY_TO_API[t] for t in selected_types_display]
     
     # Show active search parameters
     if search_query:
@@ -158,23 +617,21 @@ if view_mode == "Search Anime":
             icon="ℹ️"
         )
     
+    # Start from the first page of results whenever the search changes
+    search_key = (search_query, tuple(selected_types_api))
+    if st.session_state.get('results_search') != search_key:
+        st.session_state['results_search'] = search_key
+        st.session_state['results_shown'] = RESULTS_PAGE_SIZE
+    
+    def show_more_results():
+        st.session_state['results_shown'] += RESULTS_PAGE_SIZE
+    
     # Execute search when a query is provided
     if search_query:
         try:
             with st.spinner("Searching for anime..."):
                 logger.info(f"Searching for anime: {search_query}")
                 
-                # Prepare API request parameters
-                params = {
-                    'q': search_query,
-                    'sfw': 'true'  # Filter out adult content
-                }
-                if selected_types_api:
-                    params['type'] = ','.join(selected_types_api)
-                
-                # Debug output for parameters
-                logger.info(f"API parameters: {params}")
-                
                 # Component: Debug section for API troubleshooting
                 # if st.checkbox("Debug API Call"):
                 #     st.write("Making direct API call for debugging...")
@@ -206,26 +663,15 @@ if view_mode == "Search Anime":
                 #         if 'data' in simple_data:
                 #             st.write(f"Simple search found {len(simple_data['data'])} results")
 
-                # Make the actual API request
-                results = rate_limited_request(f"{JIKAN_API_URL}/anime", params=params)
+                # Make the actual API request (cached per query and type selection)
+                df = fetch_search_df(search_query, tuple(selected_types_api))
                 
                 # Handle case where no results are found
-                if not results.get('data'):
+                if df.empty:
                     st.warning("No results found. Try a different search term.")
                     logger.warning(f"No results found for query: {search_query}")
                 else:
-                    # Process results and create a DataFrame for easier manipulation
                     with st.spinner("Processing results..."):
-                        df = pd.DataFrame([{
-                            'title': anime['title'],
-                            'image': anime.get('images', {}).get('jpg', {}).get('image_url', ''),
-                            'description': anime.get('synopsis', 'No description available'),
-                            'score': anime.get('score', 0),
-                            'type': anime.get('type', 'Unknown'),
-                            'episodes': anime.get('episodes', 0),
-                            'members': anime.get('members', 0)
-                        } for anime in results['data']])
-                        
                         # Apply minimum score filter to results
                         df = df[df['score'] >= min_score]
                         
@@ -236,17 +682,24 @@ if view_mode == "Search Anime":
                         else:
                             # Component 5: Expander for displaying raw results table
                             with st.expander("View Results Table"):
-                                # Display results in a more visual way
-                                for _, row in df.iterrows():
+                                # Display results in a more visual way, one page at a time
+                                results_shown = st.session_state['results_shown']
+                                for row in df.head(results_shown).itertuples():
                                     with st.container():
                                         col1, col2 = st.columns([1, 3])
                                         with col1:
-                                            st.image(row['image'], width=150)
+                                            st.image(row.image, width=150)
                                         with col2:
-                                            st.subheader(row['title'])
-                                            st.write(f"**Score:** {row['score']} | **Type:** {row['type']} | **Episodes:** {row['episodes']}")
-                                            st.write(row['description'])
+                                            st.subheader(row.title)
+                                            st.write(f"**Score:** {row.score} | **Type:** {row.type} | **Episodes:** {row.episodes}")
+                                            st.write(row.description)
                                         st.divider()
+                                
+                                if len(df) > results_shown:
+                                    st.button(
+                                        f"Load more ({len(df) - results_shown} remaining)",
+                                        on_click=show_more_results
+                                    )
                             
                             # Create interactive visualizations from the results
                             col1, col2 = st.columns(2)
@@ -254,17 +707,12 @@ if view_mode == "Search Anime":
                             with col1:
                                 with st.spinner("Creating score distribution..."):
                                     # Histogram of anime scores
-                                    fig1 = px.histogram(
-                                        df,
-                                        x='score',
-                                        title=f'Quality Distribution for "{search_query}"',
-                                        nbins=20,
-                                        color_discrete_sequence=['#FF4B4B']
-                                    )
-                                    fig1.update_layout(
-                                        height=chart_height,
-                                        xaxis_title="IMDb-style Rating (1-10)",
-                                        yaxis_title="Number of Titles"
+                                    fig1 = score_histogram(
+                                        df['score'].to_numpy(),
+                                        f'Quality Distribution for "{search_query}"',
+                                        "IMDb-style Rating (1-10)",
+                                        "Number of Titles",
+                                        chart_height
                                     )
                                     st.plotly_chart(fig1, use_container_width=True)
                             
@@ -275,9 +723,9 @@ if view_mode == "Search Anime":
                                         df,
                                         names='type',
                                         title=f'Format Distribution for "{search_query}"',
+                                        height=chart_height,
                                         color_discrete_sequence=px.colors.qualitative.Set3
                                     )
-                                    fig2.update_layout(height=chart_height)
                                     st.plotly_chart(fig2, use_container_width=True)
                                     
                             # Add search insights
@@ -293,8 +741,9 @@ if view_mode == "Search Anime":
                                 )
                                 
                             with insight_col2:
-                                most_common_type = df['type'].mode()[0]
-                                type_count = df['type'].value_counts()[most_common_type]
+                                # One value_counts pass gives both the mode and its count
+                                type_counts = df['type'].value_counts()
+                                most_common_type, type_count = type_counts.index[0], int(type_counts.iloc[0])
                                 st.metric(
                                     "Most Common Format",
                                     f"{most_common_type}",
@@ -317,9 +766,20 @@ if view_mode == "Search Anime":
 # =====================================================================
 # TOP ANIME VIEW - Shows top ranked anime with various filters
 # =====================================================================
-elif view_mode == "Top Anime":
+@st.fragment
+def top_anime_view():
+    """
+    Render the Top Anime view.
+    
+    As a fragment, switching category or format and adjusting the minimum
+    score re-filter the cached rankings without rerunning the rest of the app.
+    """
     logger.info("Accessing Top Anime view")
     
+    import plotly.express as px
+    import plotly.graph_objects as go
+    register_plot_template()
+    
     st.header("🏆 Elite Anime Rankings", divider="rainbow")
     st.caption("Discover the most acclaimed and popular anime across different categories")
     
@@ -329,9 +789,6 @@ elif view_mode == "Top Anime":
         ["All Time Best", "Currently Airing", "Most Popular", "Upcoming Releases"]
     )
     
-    # Set up parameters based on API documentation
-    params = {}
-    
     # Map user-friendly categories to API parameters
     category_mapping = {
         "All Time Best": None,  # Default top anime
@@ -340,42 +797,27 @@ elif view_mode == "Top Anime":
         "Upcoming Releases": "upcoming"
     }
     
-    if top_category != "All Time Best":
-        params['filter'] = category_mapping[top_category]
+    top_filter = category_mapping[top_category]
     
     # Additional filters in columns
     col1, col2 = st.columns(2)
     with col1:
-        type_options = ["All Types", "TV", "Movie", "OVA", "Special", "ONA", "Music"]
+        type_options = ["All Types", *TYPE_DISPLAY_TO_API]
         selected_type = st.selectbox("Format Filter", type_options)
-        if selected_type != "All Types":
-            params['type'] = selected_type.lower()
+        anime_type = TYPE_DISPLAY_TO_API.get(selected_type)  # None for "All Types"
     
     with col2:
         min_score = st.slider("Minimum Score", 0.0, 10.0, 7.0, 0.1)
     
     try:
         with st.spinner("Loading top anime..."):
-            # Get top anime data from the API
-            results = rate_limited_request(f"{JIKAN_API_URL}/top/anime", params=params)
+            # Get top anime data from the API (cached per category and format)
+            df = fetch_top_df(top_filter, anime_type)
             
-            if not results.get('data'):
+            if df.empty:
                 st.warning("Unable to fetch top anime at the moment.")
                 logger.warning("No data received from top anime API")
             else:
-                # Create a DataFrame from the API results with enhanced metadata
-                df = pd.DataFrame([{
-                    'title': anime['title'],
-                    'score': anime.get('score', 0),
-                    'members': anime.get('members', 0),
-                    'rank': anime.get('rank', 0),
-                    'type': anime.get('type', 'Unknown'),
-                    'episodes': anime.get('episodes', 'N/A'),
-                    'status': anime.get('status', 'Unknown'),
-                    'year': anime.get('year', 'Unknown'),
-                    'image_url': anime.get('images', {}).get('jpg', {}).get('image_url', '')
-                } for anime in results['data']])
-                
                 # Apply score filter
                 df = df[df['score'] >= min_score]
                 
@@ -411,17 +853,12 @@ elif view_mode == "Top Anime":
                     
                     with viz_col1:
                         # Score distribution
-                        fig1 = px.histogram(
-                            df,
-                            x='score',
-                            title='Score Distribution',
-                            nbins=20,
-                            color_discrete_sequence=['#FF4B4B']
-                        )
-                        fig1.update_layout(
-                            height=chart_height,
-                            xaxis_title="Score",
-                            yaxis_title="Number of Anime"
+                        fig1 = score_histogram(
+                            df['score'].to_numpy(),
+                            'Score Distribution',
+                            "Score",
+                            "Number of Anime",
+                            chart_height
                         )
                         st.plotly_chart(fig1, use_container_width=True)
                     
@@ -431,9 +868,9 @@ elif view_mode == "Top Anime":
                             df,
                             names='type',
                             title='Format Distribution',
+                            height=chart_height,
                             color_discrete_sequence=px.colors.qualitative.Set3
                         )
-                        fig2.update_layout(height=chart_height)
                         st.plotly_chart(fig2, use_container_width=True)
                     
                     # Add insights section
@@ -458,7 +895,7 @@ elif view_mode == "Top Anime":
                         )
                     
                     with metric_col3:
-                        most_common_type = df['type'].mode()[0]
+                        most_common_type = df['type'].value_counts().index[0]
                         st.metric(
                             "Most Common Format",
                             most_common_type,
@@ -467,7 +904,13 @@ elif view_mode == "Top Anime":
                     
                     # Original scatter plot with improvements
                     st.subheader("📈 Score vs Popularity Analysis", divider="gray")
-                    fig = go.Figure()
+                    fig = go.Figure(layout=dict(
+                        title='Correlation between Popularity and Ratings',
+                        xaxis_title='Number of Members (Popularity)',
+                        yaxis_title='Score',
+                        showlegend=False,
+                        height=chart_height
+                    ))
                     fig.add_trace(go.Scatter(
                         x=df['members'],
                         y=df['score'],
@@ -486,20 +929,12 @@ elif view_mode == "Top Anime":
                         )
                     ))
                     
-                    fig.update_layout(
-                        title='Correlation between Popularity and Ratings',
-                        xaxis_title='Number of Members (Popularity)',
-                        yaxis_title='Score',
-                        showlegend=False,
-                        height=chart_height
-                    )
-                    
                     st.plotly_chart(fig, use_container_width=True)
                     
                     # Add download capability
                     st.download_button(
                         "📥 Download Rankings Data",
-                        df.to_csv(index=False).encode('utf-8'),
+                        to_csv_bytes(df),
                         "top_anime_rankings.csv",
                         "text/csv",
                         help="Download the current rankings as a CSV file"
@@ -512,197 +947,192 @@ elif view_mode == "Top Anime":
 # =====================================================================
 # COMPARE ANIME VIEW - Compare two anime side by side
 # =====================================================================
-else:  # Compare Anime
-    logger.info("Accessing Compare Anime view")
-    
-    st.header("⚖️ Anime Comparison Engine", divider="rainbow")
-    st.caption("Analyze key differences between two anime to make informed viewing decisions")
+@st.cache_resource
+def _suggestion_cache():
+    """
+    In-memory suggestion cache shared across reruns and sessions.
     
-    # Help guide for comparison feature
-    with st.expander("💡 How to use comparison"):
-        st.markdown("""
-        Compare two anime to:
-        - See which better matches your preferences
-        - Understand time investment required
-        - Compare ratings and popularity
-        - Find common themes and genres
-        - Make informed watching decisions
-        """)
+    Unlike st.cache_data, hits return the stored list by reference instead of
+    unpickling a copy. Entries expire after 5 minutes.
     
-    # Initialize session state if needed
-    if 'anime1' not in st.session_state:
-        st.session_state.anime1 = None
-    if 'anime2' not in st.session_state:
-        st.session_state.anime2 = None
-    
-    # Function to get anime suggestions
-    @st.cache_data(ttl=300)  # Cache suggestions for 5 minutes
-    def get_anime_suggestions(search_term):
-        if not search_term:
-            return []
-        try:
-            params = {'q': search_term, 'sfw': 'true', 'limit': 5}
-            results = rate_limited_request(f"{JIKAN_API_URL}/anime", params=params)
-            if results.get('data'):
-                return [(
-                    anime['title'],
-                    anime.get('title_english', ''),
-                    anime.get('title_japanese', ''),
-                    anime.get('images', {}).get('jpg', {}).get('small_image_url', ''),
-                    str(anime.get('mal_id', ''))
-                ) for anime in results['data']]
-            return []
-        except Exception as e:
-            logger.error(f"Error fetching suggestions: {str(e)}")
-            return []
+    Returns:
+        tuple: A lock guarding the cache and a TTLCache keyed on the
+            normalized search term
+    """
+    return threading.Lock(), TTLCache(maxsize=1024, ttl=300)
 
-    # Callback functions for selection
-    def select_anime1(title):
-        st.session_state.anime1 = title
+# Function to get anime suggestions
+def get_anime_suggestions(search_term):
+    """
+    Fetch up to five title suggestions for a search term.
+    
+    Args:
+        search_term (str): The text typed in a search box
         
-    def select_anime2(title):
-        st.session_state.anime2 = title
+    Returns:
+        list: (title, english title, japanese title, thumbnail url, mal_id)
+            tuples, empty if nothing matched or the request failed
+    """
+    query = search_term.strip().lower()
+    if not query:
+        return []
+    
+    lock, cache = _suggestion_cache()
+    with lock:
+        if query in cache:
+            return cache[query]
+    
+    try:
+        params = {**SEARCH_BASE_PARAMS, 'q': query, 'limit': 5}
+        results = rate_limited_request(ANIME_URL, params=params)
+    except Exception as e:
+        # Failures are not cached, so the next rerun tries again
+        logger.error(f"Error fetching suggestions: {str(e)}")
+        return []
+    
+    suggestions = [(
+        anime['title'],
+        anime.get('title_english', ''),
+        anime.get('title_japanese', ''),
+        anime.get('images', {}).get('jpg', {}).get('small_image_url', ''),
+        str(anime.get('mal_id', ''))
+    ) for anime in results.get('data') or []]
+    with lock:
+        cache[query] = suggestions
+    return suggestions
 
-    # Create two columns for entering anime titles
-    col1, col2 = st.columns(2)
+def select_anime(slot, options):
+    """
+    Store the suggestion picked in a search column's radio.
     
-    with col1:
-        st.markdown("### First Anime")
-        # Show current selection if exists
-        if st.session_state.anime1:
-            st.success(f"Selected: {st.session_state.anime1}")
-            if st.button("Clear Selection", key="clear1"):
-                st.session_state.anime1 = None
-                st.rerun()
-        
-        anime1_search = st.text_input(
-            "Search first anime",
-            placeholder="Type to search anime...",
-            key="search1"
-        )
-        
-        # Show suggestions as the user types
-        if anime1_search:
-            suggestions1 = get_anime_suggestions(anime1_search)
-            if suggestions1:
-                st.write("Select an anime:")
-                for idx, (title, eng, jp, img, mal_id) in enumerate(suggestions1):
-                    with st.container():
-                        cols = st.columns([1, 4])
-                        with cols[0]:
-                            if img:
-                                st.image(img, width=50)
-                        with cols[1]:
-                            if st.button(
-                                title,
-                                key=f"btn1_{mal_id}_{idx}",
-                                help=f"English: {eng if eng else 'N/A'}\nJapanese: {jp if jp else 'N/A'}"
-                            ):
-                                select_anime1(title)
-                                st.rerun()
-            else:
-                st.info("No matches found. Try a different search term.")
+    Args:
+        slot (int): The search column, 1 or 2
+        options (dict): The radio options as {mal_id: (title, caption)}
+    """
+    mal_id = st.session_state[f"pick{slot}"]
+    if mal_id:
+        st.session_state[f"anime{slot}"] = {'mal_id': mal_id, 'title': options[mal_id][0]}
+
+def clear_anime(slot):
+    """
+    Clear a search column's selection.
     
-    with col2:
-        st.markdown("### Second Anime")
-        # Show current selection if exists
-        if st.session_state.anime2:
-            st.success(f"Selected: {st.session_state.anime2}")
-            if st.button("Clear Selection", key="clear2"):
-                st.session_state.anime2 = None
-                st.rerun()
-        
-        anime2_search = st.text_input(
-            "Search second anime",
-            placeholder="Type to search anime...",
-            key="search2"
-        )
-        
-        # Show suggestions as the user types
-        if anime2_search:
-            suggestions2 = get_anime_suggestions(anime2_search)
-            if suggestions2:
-                st.write("Select an anime:")
-                for idx, (title, eng, jp, img, mal_id) in enumerate(suggestions2):
-                    with st.container():
-                        cols = st.columns([1, 4])
-                        with cols[0]:
-                            if img:
-                                st.image(img, width=50)
-                        with cols[1]:
-                            if st.button(
-                                title,
-                                key=f"btn2_{mal_id}_{idx}",
-                                help=f"English: {eng if eng else 'N/A'}\nJapanese: {jp if jp else 'N/A'}"
-                            ):
-                                select_anime2(title)
-                                st.rerun()
-            else:
-                st.info("No matches found. Try a different search term.")
+    Args:
+        slot (int): The search column, 1 or 2
+    """
+    st.session_state[f"anime{slot}"] = None
+    # Reset the radio too, so the same title can be picked again
+    st.session_state[f"pick{slot}"] = None
+
+def search_column(slot):
+    """
+    Render the search box, suggestions and current selection for one anime.
+    
+    Args:
+        slot (int): The search column, 1 or 2
+    """
+    ordinal = "First" if slot == 1 else "Second"
+    selection_key = f"anime{slot}"
+    
+    st.markdown(f"### {ordinal} Anime")
+    # Show current selection if exists
+    if st.session_state[selection_key]:
+        st.success(f"Selected: {st.session_state[selection_key]['title']}")
+        st.button("Clear Selection", key=f"clear{slot}", on_click=clear_anime, args=(slot,))
     
+    anime_search = st.text_input(
+        f"Search {ordinal.lower()} anime",
+        placeholder="Type to search anime...",
+        key=f"search{slot}"
+    )
+    
+    # Show suggestions once the query is long enough to be selective
+    if len(anime_search.strip()) < MIN_SUGGESTION_QUERY_LENGTH:
+        if anime_search:
+            st.caption(f"Type at least {MIN_SUGGESTION_QUERY_LENGTH} characters to see suggestions.")
+    else:
+        suggestions = get_anime_suggestions(anime_search)
+        if suggestions:
+            # One radio instead of a container, columns and button per suggestion,
+            # keyed by MAL ID so different anime sharing a title stay distinct
+            options = {mal_id: (title, eng or jp or "") for title, eng, jp, _, mal_id in suggestions}
+            st.radio(
+                "Select an anime:",
+                list(options),
+                index=None,
+                format_func=lambda mal_id: options[mal_id][0],
+                captions=[caption for _, caption in options.values()],
+                key=f"pick{slot}",
+                on_change=select_anime,
+                args=(slot, options)
+            )
+        else:
+            st.info("No matches found. Try a different search term.")
+
+def render_comparison():
+    """
+    Render the side-by-side comparison of the two selected anime.
+    """
     # Execute comparison when both anime titles are selected
     if st.session_state.anime1 and st.session_state.anime2:
         anime1 = st.session_state.anime1
         anime2 = st.session_state.anime2
         try:
             with st.spinner("Analyzing comparison..."):
-                logger.info(f"Comparing anime: {anime1} vs {anime2}")
-                
-                # Get data for both anime using the API
-                params1 = {'q': anime1, 'sfw': 'true', 'limit': 1}
-                params2 = {'q': anime2, 'sfw': 'true', 'limit': 1}
+                logger.info(f"Comparing anime: {anime1['title']} vs {anime2['title']}")
                 
-                results1 = rate_limited_request(f"{JIKAN_API_URL}/anime", params=params1)
-                results2 = rate_limited_request(f"{JIKAN_API_URL}/anime", params=params2)
+                # Get data for both anime by the IDs stored with the selections
+                a1, a2 = fetch_many(fetch_anime_by_id, [anime1['mal_id'], anime2['mal_id']])
                 
                 # Check if both anime were found
-                if not (results1.get('data') and results2.get('data')):
+                if not (a1 and a2):
                     st.warning("One or both anime not found. Please check the titles.")
-                    logger.warning(f"Anime not found: {anime1} and/or {anime2}")
+                    logger.warning(f"Anime not found: {anime1['title']} and/or {anime2['title']}")
                 else:
-                    # Extract the data for each anime
-                    a1 = results1['data'][0]
-                    a2 = results2['data'][0]
-                    
                     # Section 1: Visual Overview
                     st.subheader("📊 Head-to-Head Overview", divider="gray")
                     overview_col1, overview_col2 = st.columns(2)
                     
                     with overview_col1:
-                        st.image(a1['images']['jpg']['image_url'], width=200)
+                        st.image(a1['image'], width=200)
                         st.markdown(f"### {a1['title']}")
-                        st.caption(f"{a1.get('synopsis', 'No synopsis available.')[:200]}...")
+                        st.caption(f"{a1['synopsis_short']}...")
                     
                     with overview_col2:
-                        st.image(a2['images']['jpg']['image_url'], width=200)
+                        st.image(a2['image'], width=200)
                         st.markdown(f"### {a2['title']}")
-                        st.caption(f"{a2.get('synopsis', 'No synopsis available.')[:200]}...")
+                        st.caption(f"{a2['synopsis_short']}...")
                     
                     # Section 2: Key Metrics Comparison
                     st.subheader("📈 Statistical Analysis", divider="gray")
                     
-                    # Compare key metrics with progress bars
-                    metrics = {
-                        'Score': (a1.get('score', 0), a2.get('score', 0), '⭐'),
-                        'Popularity': (a1.get('members', 0), a2.get('members', 0), '👥'),
-                        'Episodes': (a1.get('episodes', 0), a2.get('episodes', 0), '📺')
+                    # Compare key metrics as progress bars in a single table,
+                    # each scaled to the larger of the two values
+                    metrics_df = pd.DataFrame({
+                        'Anime': [a1['title'], a2['title']],
+                        'Score': [a1['score'] or 0, a2['score'] or 0],
+                        'Popularity': [a1['members'] or 0, a2['members'] or 0],
+                        'Episodes': [a1['episodes'] or 0, a2['episodes'] or 0]
+                    })
+                    metric_formats = {
+                        'Score': ('⭐ Score', "%.2f"),
+                        'Popularity': ('👥 Popularity', "%d"),
+                        'Episodes': ('📺 Episodes', "%d")
                     }
-                    
-                    for metric, (val1, val2, icon) in metrics.items():
-                        st.markdown(f"**{icon} {metric}**")
-                        col1, col2 = st.columns(2)
-                        
-                        max_val = max(val1, val2) if isinstance(val1, (int, float)) and isinstance(val2, (int, float)) else 1
-                        
-                        with col1:
-                            if isinstance(val1, (int, float)):
-                                st.progress(val1 / (max_val if max_val > 0 else 1))
-                            st.caption(f"{a1['title']}: {val1:,}")
-                        
-                        with col2:
-                            if isinstance(val2, (int, float)):
-                                st.progress(val2 / (max_val if max_val > 0 else 1))
-                            st.caption(f"{a2['title']}: {val2:,}")
+                    st.dataframe(
+                        metrics_df,
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={
+                            metric: st.column_config.ProgressColumn(
+                                label,
+                                format=fmt,
+                                min_value=0,
+                                max_value=float(metrics_df[metric].max()) or 1
+                            )
+                            for metric, (label, fmt) in metric_formats.items()
+                        }
+                    )
                     
                     # Section 3: Content Analysis
                     st.subheader("📖 Content Breakdown", divider="gray")
@@ -710,42 +1140,37 @@ else:  # Compare Anime
                     
                     with content_col1:
                         with st.expander(f"{a1['title']} Details"):
-                            st.write("**Type:** ", a1.get('type', 'Unknown'))
-                            st.write("**Status:** ", a1.get('status', 'Unknown'))
-                            st.write("**Aired:** ", a1.get('aired', {}).get('string', 'Unknown'))
-                            st.write("**Genres:** ", ', '.join(g['name'] for g in a1.get('genres', [])))
-                            st.write("**Studios:** ", ', '.join(s['name'] for s in a1.get('studios', [])))
+                            st.write("**Type:** ", a1['type'])
+                            st.write("**Status:** ", a1['status'])
+                            st.write("**Aired:** ", a1['aired'])
+                            st.write("**Genres:** ", ', '.join(a1['genres']))
+                            st.write("**Studios:** ", ', '.join(a1['studios']))
                     
                     with content_col2:
                         with st.expander(f"{a2['title']} Details"):
-                            st.write("**Type:** ", a2.get('type', 'Unknown'))
-                            st.write("**Status:** ", a2.get('status', 'Unknown'))
-                            st.write("**Aired:** ", a2.get('aired', {}).get('string', 'Unknown'))
-                            st.write("**Genres:** ", ', '.join(g['name'] for g in a2.get('genres', [])))
-                            st.write("**Studios:** ", ', '.join(s['name'] for s in a2.get('studios', [])))
+                            st.write("**Type:** ", a2['type'])
+                            st.write("**Status:** ", a2['status'])
+                            st.write("**Aired:** ", a2['aired'])
+                            st.write("**Genres:** ", ', '.join(a2['genres']))
+                            st.write("**Studios:** ", ', '.join(a2['studios']))
                     
                     # Section 4: Quick Insights
                     st.subheader("🎯 Quick Insights", divider="gray")
                     
+                    insights = comparison_insights(a1, a2)
+                    
                     # Score comparison
-                    score1, score2 = a1.get('score', 0), a2.get('score', 0)
-                    if score1 > score2:
-                        st.success(f"🏆 **Higher Rated:** {a1['title']} ({score1} vs {score2})")
-                    elif score2 > score1:
-                        st.success(f"🏆 **Higher Rated:** {a2['title']} ({score2} vs {score1})")
+                    if insights['winner']:
+                        title, higher, lower = insights['winner']
+                        st.success(f"🏆 **Higher Rated:** {title} ({higher} vs {lower})")
                     
                     # Genre analysis
-                    genres1 = {g['name'] for g in a1.get('genres', [])}
-                    genres2 = {g['name'] for g in a2.get('genres', [])}
-                    common_genres = genres1 & genres2
-                    if common_genres:
-                        st.info(f"🎭 **Shared Genres:** {', '.join(common_genres)}")
+                    if insights['common_genres']:
+                        st.info(f"🎭 **Shared Genres:** {', '.join(insights['common_genres'])}")
                     
                     # Time investment analysis
-                    if isinstance(a1.get('episodes'), int) and isinstance(a2.get('episodes'), int):
-                        avg_episode_length = 23  # minutes
-                        time1 = a1['episodes'] * avg_episode_length
-                        time2 = a2['episodes'] * avg_episode_length
+                    if insights['watch_minutes']:
+                        time1, time2 = insights['watch_minutes']
                         st.warning(
                             f"⏱️ **Time Investment:**\n"
                             f"- {a1['title']}: ~{time1//60}h {time1%60}m\n"
@@ -753,27 +1178,14 @@ else:  # Compare Anime
                         )
                     
                     # Download comparison data
-                    comparison_data = pd.DataFrame({
-                        'Metric': ['Score', 'Episodes', 'Members', 'Type', 'Status'],
-                        a1['title']: [
-                            a1.get('score', 'N/A'),
-                            a1.get('episodes', 'N/A'),
-                            a1.get('members', 'N/A'),
-                            a1.get('type', 'N/A'),
-                            a1.get('status', 'N/A')
-                        ],
-                        a2['title']: [
-                            a2.get('score', 'N/A'),
-                            a2.get('episodes', 'N/A'),
-                            a2.get('members', 'N/A'),
-                            a2.get('type', 'N/A'),
-                            a2.get('status', 'N/A')
-                        ]
-                    })
+                    payload = tuple(
+                        (a['title'], tuple(a[field] for _, field in COMPARISON_FIELDS))
+                        for a in (a1, a2)
+                    )
                     
                     st.download_button(
                         "📥 Download Comparison Data",
-                        comparison_data.to_csv().encode('utf-8'),
+                        comparison_csv(anime1['mal_id'], anime2['mal_id'], payload),
                         "anime_comparison.csv",
                         "text/csv",
                         help="Download detailed comparison metrics as CSV"
@@ -783,6 +1195,63 @@ else:  # Compare Anime
             st.error(f"An error occurred while comparing anime: {str(e)}")
             logger.error(f"Error in Compare Anime view: {str(e)}")
 
+@st.fragment
+def compare_panel():
+    """
+    Render both search columns and the comparison below them.
+    
+    The columns and the comparison share one fragment, so a selection or clear
+    made through a widget callback is picked up by the comparison in the same
+    fragment rerun, without an app-scope st.rerun().
+    """
+    # Create two columns for entering anime titles
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        search_column(1)
+    
+    with col2:
+        search_column(2)
+    
+    render_comparison()
+
+def compare_view():
+    """
+    Render the Compare Anime view.
+    
+    Only the header and help text live outside the compare_panel fragment, so
+    searching, selecting and clearing rerun just the panel.
+    """
+    logger.info("Accessing Compare Anime view")
+    
+    st.header("⚖️ Anime Comparison Engine", divider="rainbow")
+    st.caption("Analyze key differences between two anime to make informed viewing decisions")
+    
+    # Help guide for comparison feature
+    with st.expander("💡 How to use comparison"):
+        st.markdown("""
+        Compare two anime to:
+        - See which better matches your preferences
+        - Understand time investment required
+        - Compare ratings and popularity
+        - Find common themes and genres
+        - Make informed watching decisions
+        """)
+    
+    # Initialize session state if needed
+    st.session_state.setdefault('anime1', None)
+    st.session_state.setdefault('anime2', None)
+    
+    compare_panel()
+
+# Render only the selected view
+if view_mode == "Search Anime":
+    search_view()
+elif view_mode == "Top Anime":
+    top_anime_view()
+else:  # Compare Anime
+    compare_view()
+
 # =====================================================================
 # Optional "About" section in the sidebar
 # =====================================================================